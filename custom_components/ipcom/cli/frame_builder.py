@@ -37,8 +37,8 @@ def build_exo_set_values_frame(
     if not all(0 <= v <= 255 for v in values):
         raise ValueError("All values must be 0-255")
 
-    # Build frame data: [0x01] + [8 output values]
-    data = bytes([0x01] + values)
+    # Build frame data: [0x01] + [8 output values] (single bytes concat, no temporary list)
+    data = b'\x01' + bytes(values)
 
     # Calculate checksum (XOR of all data bytes)
     checksum = 0
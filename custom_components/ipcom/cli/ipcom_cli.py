@@ -49,6 +49,11 @@ if sys.platform == 'win32':
             sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
 
 
+# Relay suffixes stripped from shutter keys / display names to get the logical shutter name
+SHUTTER_KEY_SUFFIXES = ('_m', '_d')
+SHUTTER_DISPLAY_SUFFIXES = (' M', ' D')
+
+
 class DeviceMapper:
     """Manages device name to module/output mapping."""
 
@@ -417,8 +422,10 @@ def control_cover(client: "IPComClient", mapper: DeviceMapper, name: str, action
     down_output = down_relay['output']
 
     # Get logical shutter name (remove _m or _d suffix)
-    shutter_name = name.replace('_m', '').replace('_d', '')
-    display_name = device.get('display_name', shutter_name.upper()).replace(' M', '').replace(' D', '')
+    shutter_name = name[:-2] if name.endswith(SHUTTER_KEY_SUFFIXES) else name
+    display_name = device.get('display_name', shutter_name.upper())
+    if display_name.endswith(SHUTTER_DISPLAY_SUFFIXES):
+        display_name = display_name[:-2]
 
     # Safety check: verify current state
     snapshot = client.get_latest_snapshot()
@@ -629,7 +636,7 @@ def print_status_json(client: "IPComClient", mapper: DeviceMapper, host: str):
                 brightness = value
             else:
                 # Regular dimmers: Convert 0-255 to 0-100
-                brightness = int((value / 255) * 100) if value > 0 else 0
+                brightness = round(value * 100 / 255)
 
             device_state['brightness'] = brightness
 
@@ -829,8 +836,8 @@ def watch_mode_json(client: "IPComClient", mapper: DeviceMapper, host: str, port
 
                 # Wait for first snapshot
                 logger.debug("Waiting for first snapshot after reconnect...")
-                start = time.time()
-                while not client.get_latest_snapshot() and time.time() - start < 5:
+                deadline = time.monotonic() + 5
+                while not client.get_latest_snapshot() and time.monotonic() < deadline:
                     client._receive_loop()
                     time.sleep(0.05)
 
@@ -972,8 +979,8 @@ Device names are defined in devices.yaml
         if not args.debug and not args.json:
             print("Waiting for initial state...", end='', flush=True)
 
-        start = time.time()
-        while not client.get_latest_snapshot() and time.time() - start < 3:
+        deadline = time.monotonic() + 3
+        while not client.get_latest_snapshot() and time.monotonic() < deadline:
             client._receive_loop()  # Manually process incoming data
             time.sleep(0.05)
 
@@ -11,14 +11,24 @@ Date: 2025-12-27
 """
 
 import socket
+import struct
 import time
 import logging
 import threading
-import queue
-from typing import Optional, Callable, Iterator
+from collections import deque
+from typing import Optional, Callable, Iterator, Union
 from dataclasses import dataclass
 
 from models import Frame, StateSnapshot
+from frame_builder import (
+    build_exo_set_values_frame,
+    build_frame_request_command,
+    set_output as build_set_output_command,
+)
+
+
+def _noop(*args, **kwargs) -> None:
+    """Default callback: does nothing, so call sites need no None check."""
 
 
 class IPComEncryption:
@@ -29,71 +39,41 @@ class IPComEncryption:
     Implements both single-key (PRIVATE_KEY2) and dual-key (PRIVATE_KEY + PUBLIC_KEY) modes.
     """
 
+    ENCRYPT_CACHE_SIZE = 64  # Encrypted payloads kept per key (commands repeat often)
+
     # PRIVATE_KEY (256 bytes) - from TCPSecureCommunication.cs:17-45 (CORRECTED)
-    PRIVATE_KEY = bytes([
-        83, 131, 251, 50, 127, 126, 154, 233, 1, 179,
-        127, 128, 6, 207, 57, 38, 111, 93, 37, 91,
-        30, 38, 40, 196, 179, 120, 4, 172, 159, 11,
-        174, 157, 87, 172, 78, 130, 14, 180, 186, 108,
-        39, 56, 10, 113, 155, 225, 247, 253, 20, 204,
-        20, 13, 113, 229, 184, 247, 124, 203, 224, 11,
-        4, 120, 177, 127, 43, 234, 133, 65, 149, 34,
-        24, 238, 6, 255, 121, 19, 38, 211, 8, 16,
-        117, 4, 83, 108, 4, 253, 145, 243, 49, 147,
-        182, 20, 227, 83, 246, 206, 110, 195, 116, 254,
-        206, 98, 1, 189, 141, 17, 38, 57, 10, 116,
-        81, 202, 86, 66, 81, 213, 123, 142, 166, 71,
-        220, 127, 116, 9, 144, 143, 154, 242, 12, 116,
-        129, 100, 16, 13, 100, 206, 84, 181, 120, 129,
-        165, 144, 54, 235, 130, 201, 231, 92, 189, 63,
-        59, 41, 211, 47, 34, 110, 111, 36, 221, 251,
-        221, 152, 0, 29, 75, 130, 206, 18, 209, 51,
-        41, 34, 79, 146, 249, 148, 235, 18, 87, 47,
-        250, 48, 199, 241, 157, 114, 202, 141, 37, 235,
-        44, 61, 227, 251, 204, 188, 84, 17, 83, 37,
-        226, 206, 120, 249, 220, 111, 232, 226, 251, 65,
-        60, 237, 111, 154, 177, 243, 114, 120, 2, 204,
-        145, 61, 32, 127, 190, 233, 83, 212, 251, 255,
-        110, 66, 177, 246, 94, 77, 20, 3, 180, 251,
-        47, 83, 122, 188, 158, 167, 206, 142, 202, 8,
-        196, 123, 25, 161, 43, 127
-    ])
+    PRIVATE_KEY = bytes.fromhex(
+        "5383fb327f7e9ae901b37f8006cf39266f5d255b1e2628c4b37804ac9f0bae9d"
+        "57ac4e820eb4ba6c27380a719be1f7fd14cc140d71e5b8f77ccbe00b0478b17f"
+        "2bea8541952218ee06ff791326d308107504536c04fd91f33193b614e353f6ce"
+        "6ec374fece6201bd8d1126390a7451ca564251d57b8ea647dc7f7409908f9af2"
+        "0c748164100d64ce54b57881a59036eb82c9e75cbd3f3b29d32f226e6f24ddfb"
+        "dd98001d4b82ce12d13329224f92f994eb12572ffa30c7f19d72ca8d25eb2c3d"
+        "e3fbccbc54115325e2ce78f9dc6fe8e2fb413ced6f9ab1f3727802cc913d207f"
+        "bee953d4fbff6e42b1f65e4d1403b4fb2f537abc9ea7ce8eca08c47b19a12b7f"
+    )
 
     # PRIVATE_KEY2 (256 bytes) - from TCPSecureCommunication.cs:47-75 (CORRECTED)
     # This is a rotated version of PRIVATE_KEY, used as fallback before public key is set
-    PRIVATE_KEY2 = bytes([
-        12, 116, 129, 100, 16, 13, 100, 206, 84, 181,
-        120, 129, 165, 144, 54, 235, 130, 201, 231, 92,
-        189, 63, 59, 41, 211, 47, 34, 110, 111, 36,
-        221, 251, 221, 152, 0, 29, 75, 130, 206, 18,
-        209, 51, 41, 34, 79, 146, 249, 148, 235, 18,
-        87, 47, 250, 48, 199, 241, 157, 114, 202, 141,
-        37, 235, 44, 61, 227, 251, 204, 188, 84, 17,
-        83, 37, 226, 206, 120, 249, 220, 111, 232, 226,
-        251, 65, 60, 237, 111, 154, 177, 243, 114, 120,
-        2, 204, 145, 61, 32, 127, 190, 233, 83, 212,
-        251, 255, 110, 66, 177, 246, 94, 77, 20, 3,
-        180, 251, 47, 83, 122, 188, 158, 167, 206, 142,
-        202, 8, 196, 123, 25, 161, 43, 127, 83, 131,
-        251, 50, 127, 126, 154, 233, 1, 179, 127, 128,
-        6, 207, 57, 38, 111, 93, 37, 91, 30, 38,
-        40, 196, 179, 120, 4, 172, 159, 11, 174, 157,
-        87, 172, 78, 130, 14, 180, 186, 108, 39, 56,
-        10, 113, 155, 225, 247, 253, 20, 204, 20, 13,
-        113, 229, 184, 247, 124, 203, 224, 11, 4, 120,
-        177, 127, 43, 234, 133, 65, 149, 34, 24, 238,
-        6, 255, 121, 19, 38, 211, 8, 16, 117, 4,
-        83, 108, 4, 253, 145, 243, 49, 147, 182, 20,
-        227, 83, 246, 206, 110, 195, 116, 254, 206, 98,
-        1, 189, 141, 17, 38, 57, 10, 116, 81, 202,
-        86, 66, 81, 213, 123, 142, 166, 71, 220, 127,
-        116, 9, 144, 143, 154, 242
-    ])
+    PRIVATE_KEY2 = bytes.fromhex(
+        "0c748164100d64ce54b57881a59036eb82c9e75cbd3f3b29d32f226e6f24ddfb"
+        "dd98001d4b82ce12d13329224f92f994eb12572ffa30c7f19d72ca8d25eb2c3d"
+        "e3fbccbc54115325e2ce78f9dc6fe8e2fb413ced6f9ab1f3727802cc913d207f"
+        "bee953d4fbff6e42b1f65e4d1403b4fb2f537abc9ea7ce8eca08c47b19a12b7f"
+        "5383fb327f7e9ae901b37f8006cf39266f5d255b1e2628c4b37804ac9f0bae9d"
+        "57ac4e820eb4ba6c27380a719be1f7fd14cc140d71e5b8f77ccbe00b0478b17f"
+        "2bea8541952218ee06ff791326d308107504536c04fd91f33193b614e353f6ce"
+        "6ec374fece6201bd8d1126390a7451ca564251d57b8ea647dc7f7409908f9af2"
+    )
 
     def __init__(self):
         """Initialize encryption with default settings."""
         self._public_key: Optional[bytes] = None
         self._secure = True  # Encryption always enabled by default
+        # Active 256-byte key table indexed by pingPong (single-key mode until a public key is set)
+        self._key: bytes = self.PRIVATE_KEY2
+        # Plaintext -> ciphertext for the active key (the cipher restarts per message)
+        self._encrypt_cache: dict[bytes, bytes] = {}
 
     def set_public_key(self, public_key: Optional[bytes]):
         """
@@ -109,6 +89,24 @@ class IPComEncryption:
             raise ValueError(f"Public key must be 128 bytes, got {len(public_key)}")
         self._public_key = public_key
 
+        if public_key is None:
+            self._key = self.PRIVATE_KEY2
+        else:
+            # Fold PRIVATE_KEY[pingPong] ^ PUBLIC_KEY[pingPong % 128] into one table,
+            # XORing the whole buffers as big integers
+            self._key = (
+                int.from_bytes(self.PRIVATE_KEY, 'big')
+                ^ int.from_bytes(public_key * 2, 'big')
+            ).to_bytes(256, 'big')
+
+        # Swap the cache only after the new key is in place: encrypt() binds the cache
+        # before reading the key, so a racing call can only fill the discarded dict
+        self.clear_cache()
+
+    def clear_cache(self):
+        """Drop all cached ciphertexts (they are only valid for the current key)."""
+        self._encrypt_cache = {}
+
     def encrypt(self, data: bytes) -> bytes:
         """
         Encrypt data using XOR cipher.
@@ -127,29 +125,35 @@ class IPComEncryption:
         Returns:
             Encrypted bytes
         """
-        if not self._secure:
+        if not self._secure or not data:
             return data
 
+        if not isinstance(data, bytes):
+            data = bytes(data)  # Cache keys must be hashable
+        cache = self._encrypt_cache
+        encrypted = cache.get(data)
+        if encrypted is not None:
+            return encrypted
+
+        key = self._key  # PRIVATE_KEY2, or PRIVATE_KEY ^ PUBLIC_KEY in dual-key mode
         result = bytearray(len(data))
         ping_pong = 0  # Reset for each message
 
-        for pos in range(len(data)):
+        for pos, a in enumerate(data):
             ping_pong ^= pos
-            a = data[pos]
-
-            if self._public_key is not None and len(self._public_key) > 0:
-                # Dual-key mode: XOR with both PRIVATE_KEY and PUBLIC_KEY
-                encrypted_byte = a ^ self.PRIVATE_KEY[ping_pong] ^ self._public_key[ping_pong % len(self._public_key)]
-            else:
-                # Single-key mode: XOR with PRIVATE_KEY2 only
-                encrypted_byte = a ^ self.PRIVATE_KEY2[ping_pong]
-
+            encrypted_byte = a ^ key[ping_pong]
             result[pos] = encrypted_byte
             ping_pong = encrypted_byte  # Update with ENCRYPTED byte
 
-        return bytes(result)
+        encrypted = bytes(result)
+        # Start over when full; the working set (keepalive, snapshot and a few
+        # module commands) refills it immediately
+        if len(cache) >= self.ENCRYPT_CACHE_SIZE:
+            cache.clear()
+        cache[data] = encrypted
+        return encrypted
 
-    def decrypt(self, data: bytes) -> bytes:
+    def decrypt(self, data: Union[bytes, bytearray]) -> Union[bytes, bytearray]:
         """
         Decrypt data using XOR cipher.
 
@@ -159,32 +163,63 @@ class IPComEncryption:
         XOR is symmetric, so decrypt logic is identical to encrypt.
 
         Args:
-            data: Encrypted bytes
+            data: Encrypted bytes or bytearray
 
         Returns:
-            Plaintext bytes
+            Plaintext as a new bytearray (returned without an extra bytes() copy),
+            or the input unchanged in NonSecure mode or when empty
         """
-        if not self._secure:
+        if not self._secure or not data:
             return data
 
+        key = self._key  # PRIVATE_KEY2, or PRIVATE_KEY ^ PUBLIC_KEY in dual-key mode
         result = bytearray(len(data))
         ping_pong = 0  # Reset for each message
 
-        for pos in range(len(data)):
+        for pos, encrypted_byte in enumerate(data):
             ping_pong ^= pos
-            encrypted_byte = data[pos]
+            result[pos] = encrypted_byte ^ key[ping_pong]
+            ping_pong = encrypted_byte  # Update with ENCRYPTED byte (not decrypted!)
 
-            if self._public_key is not None and len(self._public_key) > 0:
-                # Dual-key mode: XOR with both PRIVATE_KEY and PUBLIC_KEY
-                plaintext_byte = encrypted_byte ^ self.PRIVATE_KEY[ping_pong] ^ self._public_key[ping_pong % len(self._public_key)]
-            else:
-                # Single-key mode: XOR with PRIVATE_KEY2 only
-                plaintext_byte = encrypted_byte ^ self.PRIVATE_KEY2[ping_pong]
+        return result
 
-            result[pos] = plaintext_byte
+    def decrypt_with_checksum(
+        self, data: Union[bytes, bytearray, memoryview]
+    ) -> tuple[Union[bytes, bytearray], int]:
+        """
+        Decrypt data and compute the frame checksum in a single pass.
+
+        The frame checksum is the XOR of the ENCRYPTED data bytes, so it can be
+        folded into the decrypt loop instead of walking the data twice.
+
+        Args:
+            data: Encrypted frame data (any bytes-like object, e.g. a memoryview)
+
+        Returns:
+            Tuple of (plaintext as a new bytearray, or bytes in NonSecure mode or when
+            empty, XOR checksum of the encrypted bytes)
+        """
+        if not data:
+            return b'', 0
+
+        checksum = 0
+
+        if not self._secure:
+            for byte in data:
+                checksum ^= byte
+            return bytes(data), checksum
+
+        key = self._key  # PRIVATE_KEY2, or PRIVATE_KEY ^ PUBLIC_KEY in dual-key mode
+        result = bytearray(len(data))
+        ping_pong = 0  # Reset for each message
+
+        for pos, encrypted_byte in enumerate(data):
+            ping_pong ^= pos
+            result[pos] = encrypted_byte ^ key[ping_pong]
+            checksum ^= encrypted_byte
             ping_pong = encrypted_byte  # Update with ENCRYPTED byte (not decrypted!)
 
-        return bytes(result)
+        return result, checksum
 
     @property
     def is_secure(self) -> bool:
@@ -225,10 +260,15 @@ class IPComClient:
 
     # Protocol constants
     FRAME_START_BYTE = 0x23
+    FRAME_HEADER = struct.Struct('BBBB')  # Start, To, From, Length
     DEFAULT_PORT = 5000
     RECV_BUFFER_SIZE = 8192
+    RECV_COMPACT_THRESHOLD = 4096  # Consumed bytes kept in the receive buffer before compacting
     SOCKET_TIMEOUT = 5.0  # seconds
     WRITE_RATE_LIMIT = 0.2  # seconds between writes
+    SNAPSHOT_REQUEST_BYTES = b'\x79\xdb'  # RAW snapshot request (encrypted [05 01])
+    SNAPSHOT_HEADER = b'\x79\xdb'  # First 2 bytes of a RAW StateSnapshot (same encrypted [05 01])
+    DISCONNECT_FRAME_BYTES = b'\x23\x01\x00\x02\x02\x02'  # Frame to=1 from=0 data=[CMD_DISCONNECT_RESPONSE]
 
     # Command types (from ResponseCommandFactory.cs)
     CMD_CONNECT_RESPONSE = 1
@@ -240,6 +280,10 @@ class IPComClient:
     CMD_NONSECURE_CONNECT = 14
     CMD_TRICOM_RESPONSE = 35
 
+    # Output value for full ON per module: module 6 (EXO DIM) uses 0-100, others 0-255
+    MODULE_FULL_SCALE = {6: 100}
+    DEFAULT_FULL_SCALE = 255
+
     # Reconnection strategy
     RECONNECT_BASE_DELAY = 1.0  # seconds
     RECONNECT_MAX_DELAY = 30.0  # seconds
@@ -247,8 +291,10 @@ class IPComClient:
 
     # Background loop intervals (from official app reverse engineering)
     KEEPALIVE_INTERVAL = 30.0  # seconds - prevents TCP timeout
+    TCP_KEEPALIVE_PROBE_INTERVAL = 10  # seconds between unanswered TCP keepalive probes
+    TCP_KEEPALIVE_PROBES = 3  # unanswered probes before the kernel drops the connection
     STATUS_POLL_INTERVAL = 0.350  # seconds (350ms) - continuous state updates
-    COMMAND_QUEUE_INTERVAL = 0.250  # seconds (250ms) - process queued commands
+    COMMAND_RESPONSE_DELAY = 0.1  # seconds - wait after each queued command for the response
 
     def __init__(self, host: str, port: int = DEFAULT_PORT,
                  username: str = "", password: str = "", debug: bool = False):
@@ -275,11 +321,17 @@ class IPComClient:
         self._socket: Optional[socket.socket] = None
         self._connected = False
         self._recv_buffer = bytearray()
+        self._recv_head = 0  # Start of unparsed data in _recv_buffer
+        # Reusable landing area for recv_into(), avoids allocating a bytes object per read
+        self._recv_chunk = bytearray(self.RECV_BUFFER_SIZE)
+        self._recv_chunk_view = memoryview(self._recv_chunk)
 
         # State tracking
         self._latest_snapshot: Optional[StateSnapshot] = None
-        self._last_write_time = 0.0
-        self._polling_enabled = False
+        # Last RAW StateSnapshot as (encrypted bytes, decrypted bytes), reset whenever the key changes
+        self._last_raw_snapshot: Optional[tuple[bytes, bytes]] = None
+        self._write_deadline = 0.0  # time.monotonic() before which the next write must wait
+        self._poll_stop = threading.Event()  # Set to stop start_snapshot_polling's thread
         self._processing = False
 
         # Shadow state: tracks pending writes that haven't been confirmed by server yet
@@ -295,20 +347,28 @@ class IPComClient:
         self._bus_number = 1
 
         # Callbacks
-        self._on_state_snapshot: Optional[Callable[[StateSnapshot], None]] = None
-        self._on_frame: Optional[Callable[[Frame], None]] = None
-        self._on_connect: Optional[Callable[[], None]] = None
-        self._on_disconnect: Optional[Callable[[], None]] = None
+        self._on_state_snapshot: Callable[[StateSnapshot], None] = _noop
+        self._on_frame: Callable[[Frame], None] = _noop
+        self._on_connect: Callable[[], None] = _noop
+        self._on_disconnect: Callable[[], None] = _noop
+
+        # Received frame handlers by command type (see _process_frame)
+        self._frame_handlers: dict[int, Callable[[Frame], None]] = {
+            self.CMD_CONNECT_RESPONSE: self._handle_connect_response,
+            self.CMD_EXO_OUTPUTS_RESPONSE: self._handle_state_snapshot,
+            self.CMD_KEEPALIVE_RESPONSE: self._handle_keepalive_response,
+            self.CMD_DISCONNECT_RESPONSE: self._handle_disconnect_response,
+        }
 
         # Background threads and command queue (persistent connection mode)
         self._persistent_mode = False
-        self._keepalive_thread: Optional[threading.Thread] = None
-        self._status_poll_thread: Optional[threading.Thread] = None
-        self._command_queue_thread: Optional[threading.Thread] = None
+        self._scheduler_thread: Optional[threading.Thread] = None
         self._receive_thread: Optional[threading.Thread] = None
-        self._command_queue: queue.Queue = queue.Queue()
+        # Commands are appended by callers and popped by the scheduler thread only;
+        # deque append/popleft are atomic, the event just wakes the scheduler
+        self._command_deque: deque[tuple[Callable, tuple, dict]] = deque()
+        self._command_event = threading.Event()
         self._shutdown_event = threading.Event()
-        self._lock = threading.RLock()  # For thread-safe operations
 
     def connect(self) -> bool:
         """
@@ -330,6 +390,12 @@ class IPComClient:
             # Create socket
             self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self._socket.settimeout(self.SOCKET_TIMEOUT)
+            # Every write is a small, complete request (2-byte snapshot poll, short
+            # commands); send it right away instead of letting Nagle hold it back
+            self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._enable_tcp_keepalive()
+            # SO_RCVBUF stays at the kernel default: one 130-byte snapshot per poll
+            # never comes close to filling it
 
             # Connect
             self._socket.connect((self.host, self.port))
@@ -342,8 +408,7 @@ class IPComClient:
             )
 
             # Trigger callback
-            if self._on_connect:
-                self._on_connect()
+            self._on_connect()
 
             return True
 
@@ -396,24 +461,51 @@ class IPComClient:
 
         # Send disconnect command (optional, device will handle TCP close)
         try:
-            disconnect_frame = self._build_frame(to=1, from_=0, data=bytes([self.CMD_DISCONNECT_RESPONSE]))
-            self.send_frame_bytes(disconnect_frame.to_bytes())
+            self.send_frame_bytes(self.DISCONNECT_FRAME_BYTES)
         except Exception as e:
-            self.logger.debug(f"Error sending disconnect frame: {e}")
+            self.logger.debug("Error sending disconnect frame: %s", e)
 
         # Close socket
         self._cleanup_socket()
 
         # Trigger callback
-        if self._on_disconnect:
-            self._on_disconnect()
+        self._on_disconnect()
 
         self.logger.info("Disconnected")
 
+    def _enable_tcp_keepalive(self):
+        """
+        Let the kernel probe idle connections so a silently dropped peer is noticed.
+
+        Probing starts after KEEPALIVE_INTERVAL idle seconds and gives up after
+        TCP_KEEPALIVE_PROBES unanswered probes, so a dead peer surfaces as a socket
+        error within about a minute. Options the platform lacks or rejects are skipped.
+        """
+        options = (
+            (socket.SOL_SOCKET, "SO_KEEPALIVE", 1),
+            (socket.IPPROTO_TCP, "TCP_KEEPIDLE", int(self.KEEPALIVE_INTERVAL)),
+            (socket.IPPROTO_TCP, "TCP_KEEPINTVL", self.TCP_KEEPALIVE_PROBE_INTERVAL),
+            (socket.IPPROTO_TCP, "TCP_KEEPCNT", self.TCP_KEEPALIVE_PROBES),
+        )
+        for level, name, value in options:
+            option = getattr(socket, name, None)
+            if option is None:
+                continue
+            try:
+                self._socket.setsockopt(level, option, value)
+            except OSError as e:
+                self.logger.debug("Could not set %s: %s", name, e)
+
+    def _reset_key_caches(self):
+        """Drop everything cached for the current encryption key."""
+        self._last_raw_snapshot = None
+        self._encryption.clear_cache()
+
     def _cleanup_socket(self):
         """Clean up socket resources."""
         self._connected = False
         self._authenticated = False
+        self._reset_key_caches()
         if self._socket:
             try:
                 self._socket.close()
@@ -477,8 +569,8 @@ class IPComClient:
             )
 
             if self.debug:
-                hex_preview = ' '.join(f'{b:02x}' for b in auth_packet[:32])
-                self.logger.debug(f"TX (RAW): {hex_preview}... ({len(auth_packet)} bytes total)")
+                hex_preview = auth_packet[:32].hex(' ')
+                self.logger.debug("TX (RAW): %s... (%d bytes total)", hex_preview, len(auth_packet))
 
             # Send encrypted authentication packet
             self._socket.sendall(auth_packet)
@@ -486,15 +578,17 @@ class IPComClient:
 
             # Receive ConnectResponse (135 bytes RAW encrypted with public key)
             self.logger.debug("Waiting for ConnectResponse (135 bytes)...")
-            response = self._socket.recv(135)
-
-            if len(response) < 135:
-                # Try to receive remaining bytes
-                while len(response) < 135:
-                    chunk = self._socket.recv(135 - len(response))
-                    if not chunk:
+            # Read straight into a preallocated buffer until complete or the peer closes
+            response = bytearray(135)
+            received = 0
+            recv_into = self._socket.recv_into
+            with memoryview(response) as response_view:
+                while received < 135:
+                    count = recv_into(response_view[received:])
+                    if not count:
                         break
-                    response += chunk
+                    received += count
+            del response[received:]
 
             if len(response) != 135:
                 self.logger.error(
@@ -503,7 +597,7 @@ class IPComClient:
                     len(response)
                 )
                 if len(response) > 0:
-                    hex_dump = ' '.join(f'{b:02x}' for b in response[:64])
+                    hex_dump = response[:64].hex(' ')
                     self.logger.error("Response data (first 64 bytes): %s", hex_dump)
 
                     # Check for 7e e3 error
@@ -515,16 +609,16 @@ class IPComClient:
                 return False
 
             if self.debug:
-                hex_preview = ' '.join(f'{b:02x}' for b in response[:32])
-                self.logger.debug(f"RX (RAW): {hex_preview}... (135 bytes)")
+                hex_preview = response[:32].hex(' ')
+                self.logger.debug("RX (RAW): %s... (135 bytes)", hex_preview)
 
             # Decrypt ConnectResponse
             decrypted = self._encryption.decrypt(response)
             cmd_type = decrypted[0]
 
             if self.debug:
-                dec_preview = ' '.join(f'{b:02x}' for b in decrypted[:20])
-                self.logger.debug(f"Decrypted: {dec_preview}... (Command type: 0x{cmd_type:02x})")
+                dec_preview = decrypted[:20].hex(' ')
+                self.logger.debug("Decrypted: %s... (Command type: 0x%02x)", dec_preview, cmd_type)
 
             if cmd_type != 0x01:
                 self.logger.error(
@@ -537,10 +631,11 @@ class IPComClient:
             # Extract public key from bytes[7:135]
             public_key = decrypted[7:135]
             self._encryption.set_public_key(public_key)
+            self._reset_key_caches()
 
             if self.debug:
-                pk_preview = ' '.join(f'{b:02x}' for b in public_key[:16])
-                self.logger.debug(f"Public key extracted: {pk_preview}... (128 bytes)")
+                pk_preview = public_key[:16].hex(' ')
+                self.logger.debug("Public key extracted: %s... (128 bytes)", pk_preview)
 
             self.logger.info("Received ConnectResponse (135 bytes) - Public key extracted")
             self.logger.info("Switched to dual-key encryption mode (PRIVATE_KEY + PUBLIC_KEY)")
@@ -605,28 +700,14 @@ class IPComClient:
         Returns:
             56-byte ConnectRequest payload
         """
-        payload = bytearray()
-
-        # Command ID and Version
-        payload.extend([1, 2])
-
         # Username: "USER:<username>" padded to 26 bytes
-        username_str = f"USER:{self._username}"
-        username_padding = " " * (26 - len(username_str))
-        username_field = (username_str + username_padding).encode('utf-8')
-        payload.extend(username_field)
+        username_field = f"USER:{self._username}".ljust(26).encode('utf-8')
 
         # Password: "PWD:<password>" padded to 26 bytes
-        password_str = f"PWD:{self._password}"
-        password_padding = " " * (26 - len(password_str))
-        password_field = (password_str + password_padding).encode('utf-8')
-        payload.extend(password_field)
-
-        # Bus number and lock
-        payload.append(self._bus_number)
-        payload.append(0)
+        password_field = f"PWD:{self._password}".ljust(26).encode('utf-8')
 
-        return bytes(payload)
+        # Command ID and Version, credentials, bus number and lock
+        return b'\x01\x02' + username_field + password_field + bytes((self._bus_number, 0))
 
     def _handle_connect_response(self, frame: Frame):
         """
@@ -651,6 +732,7 @@ class IPComClient:
         if len(data) >= 2 and data[0] == 14 and data[1] == 101:
             self.logger.warning("IPCom requested NonSecure mode - disabling encryption")
             self._encryption._secure = False
+            self._reset_key_caches()
             self._authenticated = True  # Mark as authenticated (but without encryption)
             return
 
@@ -658,7 +740,7 @@ class IPComClient:
         connection_status = data[0]
 
         if connection_status != 1:
-            self.logger.error(f"Authentication failed: connection_status={connection_status}")
+            self.logger.error("Authentication failed: connection_status=%s", connection_status)
             return
 
         # Short response (3 bytes): [status, ?, ?]
@@ -671,10 +753,11 @@ class IPComClient:
         if len(data) >= 135:
             public_key = data[7:135]
             self._encryption.set_public_key(public_key)
+            self._reset_key_caches()
             self._authenticated = True
-            self.logger.info(f"Public key set ({len(public_key)} bytes) - dual-key mode active")
+            self.logger.info("Public key set (%d bytes) - dual-key mode active", len(public_key))
         else:
-            self.logger.warning(f"ConnectResponse too short for public key: {len(data)} bytes")
+            self.logger.warning("ConnectResponse too short for public key: %d bytes", len(data))
             self._authenticated = True
 
     def is_connected(self) -> bool:
@@ -691,6 +774,7 @@ class IPComClient:
         This is a blocking call. Use in a separate thread if needed.
         """
         reconnect_delay = self.RECONNECT_BASE_DELAY
+        receive = self._receive_loop
 
         while True:
             # Connect if not connected
@@ -703,19 +787,19 @@ class IPComClient:
                         break
 
                     # Exponential backoff
-                    self.logger.info(f"Reconnecting in {reconnect_delay:.1f}s...")
+                    self.logger.info("Reconnecting in %.1fs...", reconnect_delay)
                     time.sleep(reconnect_delay)
                     reconnect_delay = min(reconnect_delay * self.RECONNECT_MULTIPLIER, self.RECONNECT_MAX_DELAY)
                     continue
 
             # Receive and process frames
             try:
-                self._receive_loop()
+                receive()
             except socket.timeout:
                 # Timeout is normal, just continue
                 continue
             except socket.error as e:
-                self.logger.error(f"Socket error: {e}")
+                self.logger.error("Socket error: %s", e)
                 self._cleanup_socket()
                 if not auto_reconnect:
                     break
@@ -724,7 +808,7 @@ class IPComClient:
                 self.disconnect()
                 break
             except Exception as e:
-                self.logger.error(f"Unexpected error in receive loop: {e}", exc_info=True)
+                self.logger.error("Unexpected error in receive loop: %s", e, exc_info=True)
                 self._cleanup_socket()
                 if not auto_reconnect:
                     break
@@ -741,7 +825,7 @@ class IPComClient:
 
         # Receive data
         try:
-            data = self._socket.recv(self.RECV_BUFFER_SIZE)
+            received = self._socket.recv_into(self._recv_chunk)
         except socket.timeout:
             # Timeout is normal in non-blocking mode, just return
             raise
@@ -767,7 +851,7 @@ class IPComClient:
             self._cleanup_socket()
             raise
 
-        if not data:
+        if not received:
             # Empty recv() means connection closed
             self.logger.warning(
                 "CONN_CLOSED | connection closed by %s:%s | "
@@ -777,12 +861,14 @@ class IPComClient:
             self._cleanup_socket()
             return
 
+        data = self._recv_chunk_view[:received]
+
         if self.debug:
-            hex_dump = ' '.join(f'{b:02x}' for b in data[:64])
-            self.logger.debug(f"RX {len(data)} bytes: {hex_dump}")
+            hex_dump = data[:64].hex(' ')
+            self.logger.debug("RX %d bytes: %s", received, hex_dump)
 
         # Append to buffer
-        self._recv_buffer.extend(data)
+        self._recv_buffer += data
 
         # Parse all complete frames from buffer
         for frame in self._parse_frames():
@@ -809,143 +895,163 @@ class IPComClient:
 
         We must check for RAW StateSnapshot BEFORE looking for framed messages.
         """
-        while len(self._recv_buffer) >= 2:
-            # Check for RAW StateSnapshot message (79 db header)
-            if len(self._recv_buffer) >= 130 and self._recv_buffer[0] == 0x79 and self._recv_buffer[1] == 0xdb:
-                if self.debug:
-                    self.logger.debug("Detected RAW StateSnapshot message (130 bytes)")
-
-                # Extract 130 bytes (FULLY ENCRYPTED ExoOutputsResponseCommand)
-                encrypted_snapshot = bytes(self._recv_buffer[:130])
-
-                # Remove from buffer
-                self._recv_buffer = self._recv_buffer[130:]
-
-                try:
-                    # CRITICAL FIX: The entire 130 bytes are encrypted!
-                    # "79 db" is NOT a plaintext header - it's the encrypted [05 01] command ID/version!
-                    # When we encrypt ExoOutputsRequestCommand [05 01], we get [79 db]
-                    # So the response [79 db + 128 bytes] is actually [05 01 + 128 bytes] encrypted
-
-                    # Decrypt ALL 130 bytes
-                    decrypted = self._encryption.decrypt(encrypted_snapshot)
-
-                    if self.debug:
-                        self.logger.debug(f"Decrypted StateSnapshot: ID={decrypted[0]:02x} Ver={decrypted[1]:02x} Data={decrypted[2:18].hex()}...")
-
-                    # After decryption, we should have:
-                    # Byte 0-1: [05 01] (ExoOutputsResponseCommand ID and version)
-                    # Byte 2-129: 128 bytes of module data (16 modules × 8 outputs)
-                    full_snapshot_data = decrypted
-
-                    snapshot = StateSnapshot(raw=full_snapshot_data, timestamp=time.time())
+        buf = self._recv_buffer
+        head = self._recv_head  # Consumed bytes are skipped, not sliced off, until compaction
 
+        try:
+            while len(buf) - head >= 2:
+                # Check for RAW StateSnapshot message (79 db header)
+                if len(buf) - head >= 130 and buf.startswith(self.SNAPSHOT_HEADER, head):
                     if self.debug:
-                        self.logger.debug(f"StateSnapshot created: {snapshot}")
+                        self.logger.debug("Detected RAW StateSnapshot message (130 bytes)")
 
-                    # Store latest snapshot
-                    self._latest_snapshot = snapshot
+                    # Extract 130 bytes (FULLY ENCRYPTED ExoOutputsResponseCommand)
+                    encrypted_snapshot = bytes(buf[head:head + 130])
 
-                    # Clear shadow state - server has confirmed the state
-                    self._pending_writes.clear()
+                    # Remove from buffer
+                    head += 130
 
-                    # Trigger callback
-                    if self._on_state_snapshot:
+                    try:
+                        # Idle installations keep sending the same state: if the encrypted bytes
+                        # match the previous snapshot, reuse its plaintext instead of decrypting again
+                        last_raw = self._last_raw_snapshot
+                        if last_raw is not None and last_raw[0] == encrypted_snapshot:
+                            decrypted = last_raw[1]
+                        else:
+                            # CRITICAL FIX: The entire 130 bytes are encrypted!
+                            # "79 db" is NOT a plaintext header - it's the encrypted [05 01] command ID/version!
+                            # When we encrypt ExoOutputsRequestCommand [05 01], we get [79 db]
+                            # So the response [79 db + 128 bytes] is actually [05 01 + 128 bytes] encrypted
+
+                            # Decrypt ALL 130 bytes
+                            # bytes, not the bytearray from decrypt(): cached and shared by every reuse
+                            decrypted = bytes(self._encryption.decrypt(encrypted_snapshot))
+                            self._last_raw_snapshot = (encrypted_snapshot, decrypted)
+
+                            if self.debug:
+                                self.logger.debug("Decrypted StateSnapshot: ID=%02x Ver=%02x Data=%s...", decrypted[0], decrypted[1], decrypted[2:18].hex())
+
+                        # After decryption, we should have:
+                        # Byte 0-1: [05 01] (ExoOutputsResponseCommand ID and version)
+                        # Byte 2-129: 128 bytes of module data (16 modules × 8 outputs)
+                        full_snapshot_data = decrypted
+
+                        snapshot = StateSnapshot(raw=full_snapshot_data, timestamp=time.time())
+
+                        if self.debug:
+                            self.logger.debug("StateSnapshot created: %s", snapshot)
+
+                        # Store latest snapshot
+                        self._latest_snapshot = snapshot
+
+                        # Clear shadow state - server has confirmed the state
+                        self._pending_writes.clear()
+
+                        # Trigger callback
                         self._on_state_snapshot(snapshot)
 
-                except Exception as e:
-                    self.logger.error(f"Error parsing RAW StateSnapshot: {e}")
-                    import traceback
-                    traceback.print_exc()
+                    except Exception as e:
+                        self.logger.error("Error parsing RAW StateSnapshot: %s", e, exc_info=True)
 
-                # Continue to next iteration
-                continue
+                    # Continue to next iteration
+                    continue
 
-            # No RAW StateSnapshot, check for framed messages
-            if len(self._recv_buffer) < 5:  # Minimum frame size
-                break
+                # No RAW StateSnapshot, check for framed messages
+                if len(buf) - head < 5:  # Minimum frame size
+                    break
+
+                # Find start byte (normally right at the head; only search when resyncing)
+                if buf[head] == self.FRAME_START_BYTE:
+                    start_idx = head
+                else:
+                    start_idx = buf.find(self.FRAME_START_BYTE, head)
 
-            # Find start byte
-            start_idx = self._recv_buffer.find(self.FRAME_START_BYTE)
+                if start_idx == -1:
+                    # No start byte found, check if buffer starts with 79 db but not enough bytes yet
+                    if buf.startswith(self.SNAPSHOT_HEADER, head):
+                        if self.debug:
+                            self.logger.debug("Partial StateSnapshot: have %d/130 bytes", len(buf) - head)
+                        break  # Wait for more data
 
-            if start_idx == -1:
-                # No start byte found, check if buffer starts with 79 db but not enough bytes yet
-                if len(self._recv_buffer) >= 2 and self._recv_buffer[0] == 0x79 and self._recv_buffer[1] == 0xdb:
+                    # Not a StateSnapshot and no frame start, discard
                     if self.debug:
-                        self.logger.debug(f"Partial StateSnapshot: have {len(self._recv_buffer)}/130 bytes")
-                    break  # Wait for more data
-
-                # Not a StateSnapshot and no frame start, discard
-                if self.debug:
-                    hex_dump = ' '.join(f'{b:02x}' for b in self._recv_buffer[:32])
-                    self.logger.debug(f"No start byte found, discarding {len(self._recv_buffer)} bytes: {hex_dump}")
-                self._recv_buffer.clear()
-                break
+                        hex_dump = buf[head:head + 32].hex(' ')
+                        self.logger.debug("No start byte found, discarding %d bytes: %s", len(buf) - head, hex_dump)
+                    head = len(buf)
+                    break
 
-            if start_idx > 0:
-                # Discard bytes before start byte
-                if self.debug:
-                    self.logger.debug(f"Discarding {start_idx} bytes before start byte")
-                self._recv_buffer = self._recv_buffer[start_idx:]
+                if start_idx > head:
+                    # Discard bytes before start byte
+                    if self.debug:
+                        self.logger.debug("Discarding %d bytes before start byte", start_idx - head)
+                    head = start_idx
 
-            # Check if we have enough bytes for header
-            if len(self._recv_buffer) < 4:
-                break  # Need more data
+                # Check if we have enough bytes for header
+                if len(buf) - head < 4:
+                    break  # Need more data
 
-            # Parse header
-            start = self._recv_buffer[0]
-            to = self._recv_buffer[1]
-            from_ = self._recv_buffer[2]
-            length = self._recv_buffer[3]
+                # Parse header
+                start, to, from_, length = self.FRAME_HEADER.unpack_from(buf, head)
 
-            # Calculate total frame size
-            # Frame = Start(1) + To(1) + From(1) + Length(1) + Data(length-1) + Checksum(1)
-            data_size = length - 1
-            total_size = 4 + data_size + 1
+                # Calculate total frame size
+                # Frame = Start(1) + To(1) + From(1) + Length(1) + Data(length-1) + Checksum(1)
+                data_size = length - 1
+                total_size = 4 + data_size + 1
 
-            # Check if we have complete frame
-            if len(self._recv_buffer) < total_size:
-                if self.debug:
-                    self.logger.debug(f"Incomplete frame: have {len(self._recv_buffer)}, need {total_size}")
-                break  # Need more data
+                # Check if we have complete frame
+                if len(buf) - head < total_size:
+                    if self.debug:
+                        self.logger.debug("Incomplete frame: have %d, need %d", len(buf) - head, total_size)
+                    break  # Need more data
 
-            # Extract frame bytes
-            frame_bytes = bytes(self._recv_buffer[:total_size])
+                # Locate data and checksum inside the buffer
+                data_start = head + 4
+                checksum = buf[data_start + data_size]
 
-            # Remove from buffer
-            self._recv_buffer = self._recv_buffer[total_size:]
+                # Remove from buffer
+                head += total_size
 
-            # Parse frame
-            try:
-                encrypted_data = frame_bytes[4 : 4 + data_size]
-                checksum = frame_bytes[4 + data_size]
+                # Parse frame
+                try:
+                    # Decrypt and compute the checksum (over the ENCRYPTED data) in one pass,
+                    # reading the data through a view of the buffer instead of copying it out
+                    with memoryview(buf)[data_start:data_start + data_size] as encrypted_data:
+                        data, computed_checksum = self._encryption.decrypt_with_checksum(encrypted_data)
+
+                    # Only accept the decrypted data if the checksum matches
+                    if computed_checksum != checksum:
+                        self.logger.warning("BADCHECKSUM: frame discarded (to=%s, from=%s, length=%s)", to, from_, length)
+                        continue
 
-                # Verify checksum on ENCRYPTED data
-                if not self._verify_checksum(encrypted_data, checksum):
-                    self.logger.warning(f"BADCHECKSUM: frame discarded (to={to}, from={from_}, length={length})")
-                    continue
+                    # Create Frame object with decrypted data
+                    frame = Frame(
+                        start=start,
+                        to=to,
+                        from_=from_,
+                        length=length,
+                        data=data,
+                        checksum=checksum
+                    )
 
-                # Decrypt data AFTER checksum verification
-                data = self._encryption.decrypt(encrypted_data)
-
-                # Create Frame object with decrypted data
-                frame = Frame(
-                    start=start,
-                    to=to,
-                    from_=from_,
-                    length=length,
-                    data=data,
-                    checksum=checksum
-                )
+                    if self.debug:
+                        self.logger.debug("Received: %s", frame)
 
-                if self.debug:
-                    self.logger.debug(f"Received: {frame}")
+                except Exception as e:
+                    self.logger.error("Error parsing frame: %s", e)
+                    continue
 
+                self._recv_head = head
                 yield frame
 
-            except Exception as e:
-                self.logger.error(f"Error parsing frame: {e}")
-                continue
+        finally:
+            # Compact: drop consumed bytes once everything is read or the dead prefix grows large
+            if head >= len(buf):
+                buf.clear()
+                head = 0
+            elif head >= self.RECV_COMPACT_THRESHOLD:
+                del buf[:head]
+                head = 0
+            self._recv_head = head
 
     def _verify_checksum(self, data: bytes, checksum: int) -> bool:
         """
@@ -958,10 +1064,7 @@ class IPComClient:
         Returns:
             True if checksum is valid
         """
-        computed = 0
-        for byte in data:
-            computed ^= byte
-        return computed == checksum
+        return self._compute_checksum(data) == checksum
 
     def _compute_checksum(self, data: bytes) -> int:
         """
@@ -973,6 +1076,8 @@ class IPComClient:
         Returns:
             Checksum byte
         """
+        # A plain loop beats functools.reduce and int.from_bytes folding
+        # for the short frames this protocol sends
         checksum = 0
         for byte in data:
             checksum ^= byte
@@ -986,22 +1091,23 @@ class IPComClient:
             frame: Parsed frame
         """
         # Trigger generic frame callback
-        if self._on_frame:
-            self._on_frame(frame)
+        self._on_frame(frame)
 
         # Handle specific command types
-        if frame.command_type == self.CMD_CONNECT_RESPONSE:
-            self._handle_connect_response(frame)
-        elif frame.command_type == self.CMD_EXO_OUTPUTS_RESPONSE:
-            self._handle_state_snapshot(frame)
-        elif frame.command_type == self.CMD_KEEPALIVE_RESPONSE:
-            if self.debug:
-                self.logger.debug("Received KeepAlive response")
-        elif frame.command_type == self.CMD_DISCONNECT_RESPONSE:
-            self.logger.info("Received Disconnect response")
-        else:
-            if self.debug:
-                self.logger.debug(f"Received frame type {frame.command_type}")
+        handler = self._frame_handlers.get(frame.command_type)
+        if handler:
+            handler(frame)
+        elif self.debug:
+            self.logger.debug("Received frame type %s", frame.command_type)
+
+    def _handle_keepalive_response(self, frame: Frame):
+        """Handle KeepAlive response frame (command type 3)."""
+        if self.debug:
+            self.logger.debug("Received KeepAlive response")
+
+    def _handle_disconnect_response(self, frame: Frame):
+        """Handle Disconnect response frame (command type 2)."""
+        self.logger.info("Received Disconnect response")
 
     def _handle_state_snapshot(self, frame: Frame):
         """
@@ -1021,14 +1127,13 @@ class IPComClient:
             self._pending_writes.clear()
 
             if self.debug:
-                self.logger.debug(f"State snapshot received: {snapshot}")
+                self.logger.debug("State snapshot received: %s", snapshot)
 
             # Trigger callback
-            if self._on_state_snapshot:
-                self._on_state_snapshot(snapshot)
+            self._on_state_snapshot(snapshot)
 
         except Exception as e:
-            self.logger.error(f"Error decoding state snapshot: {e}")
+            self.logger.error("Error decoding state snapshot: %s", e)
 
     def _build_frame(self, to: int, from_: int, data: bytes) -> Frame:
         """
@@ -1068,18 +1173,20 @@ class IPComClient:
         if not self._connected or not self._socket:
             raise RuntimeError("Not connected")
 
-        # Rate limiting
-        elapsed = time.time() - self._last_write_time
-        if elapsed < self.WRITE_RATE_LIMIT:
-            time.sleep(self.WRITE_RATE_LIMIT - elapsed)
+        # Rate limiting (monotonic clock, immune to wall-clock jumps)
+        now = time.monotonic()
+        wait = self._write_deadline - now
+        if wait > 0:
+            time.sleep(wait)
+            now = self._write_deadline
 
         # Send
         self._socket.sendall(frame_bytes)
-        self._last_write_time = time.time()
+        self._write_deadline = now + self.WRITE_RATE_LIMIT
 
         if self.debug:
-            hex_dump = ' '.join(f'{b:02x}' for b in frame_bytes[:64])
-            self.logger.debug(f"TX {len(frame_bytes)} bytes: {hex_dump}")
+            hex_dump = frame_bytes[:64].hex(' ')
+            self.logger.debug("TX %d bytes: %s", len(frame_bytes), hex_dump)
 
     def send_frame(self, to: int, from_: int, data: bytes):
         """
@@ -1117,10 +1224,11 @@ class IPComClient:
         Returns:
             Value (0-255) or None if no snapshot available
         """
-        if not self._latest_snapshot:
+        snapshot = self._latest_snapshot
+        if snapshot is None:
             return None
 
-        return self._latest_snapshot.get_value(module, output)
+        return snapshot.get_value(module, output)
 
     def send_command(self, command_bytes: bytes) -> None:
         """
@@ -1140,10 +1248,10 @@ class IPComClient:
 
         # Send encrypted command
         self._socket.sendall(encrypted)
-        self._last_write_time = time.time()
+        self._write_deadline = time.monotonic() + self.WRITE_RATE_LIMIT
 
         if self.debug:
-            self.logger.debug(f"Sent command: {command_bytes.hex()} (encrypted: {encrypted.hex()})")
+            self.logger.debug("Sent command: %s (encrypted: %s)", command_bytes.hex(), encrypted.hex())
 
     def set_output(self, module: int, output: int, value: int, bus_address: int = 60, bus_number: int = 2) -> None:
         """
@@ -1159,22 +1267,18 @@ class IPComClient:
         Raises:
             RuntimeError: If not connected
         """
-        from frame_builder import set_output
-
-        command = set_output(module, output, value, bus_address, bus_number)
+        command = build_set_output_command(module, output, value, bus_address, bus_number)
         self.send_command(command)
 
         if self.debug:
-            self.logger.debug(f"Set Module {module}, Output {output} to {value}")
+            self.logger.debug("Set Module %s, Output %s to %s", module, output, value)
 
     def turn_on(self, module: int, output: int, **kwargs) -> None:
-        """Turn output ON (255).
+        """Turn output ON (255, or 100 on module 6 / EXO DIM).
 
         Uses set_value() which preserves other outputs in the module.
         """
-        # Module 6 (EXO DIM) uses 100 for full brightness, others use 255
-        value = 100 if module == 6 else 255
-        self.set_value(module, output, value)
+        self.set_value(module, output, self.MODULE_FULL_SCALE.get(module, self.DEFAULT_FULL_SCALE))
 
     def turn_off(self, module: int, output: int, **kwargs) -> None:
         """Turn output OFF (0).
@@ -1195,12 +1299,8 @@ class IPComClient:
         if not (0 <= percentage <= 100):
             raise ValueError(f"percentage must be 0-100, got {percentage}")
 
-        # Module 6 (EXO DIM) uses 0-100 values directly
-        # Regular modules use 0-255 range
-        if module == 6:
-            value = percentage
-        else:
-            value = int((percentage / 100.0) * 255)
+        # Scale to the module's range (0-100 for EXO DIM, 0-255 otherwise)
+        value = percentage * self.MODULE_FULL_SCALE.get(module, self.DEFAULT_FULL_SCALE) // 100
 
         self.set_value(module, output, value)
 
@@ -1237,22 +1337,18 @@ class IPComClient:
 
         # Get current module values from shadow state (pending writes) or snapshot
         # This prevents race condition where rapid commands overwrite each other
-        if module in self._pending_writes:
-            # Use shadow state (includes pending writes not yet confirmed)
-            values = self._pending_writes[module].copy()
-        else:
-            # No pending writes, use snapshot
+        values = self._pending_writes.get(module)
+        if values is None:
+            # No pending writes, start from a copy of the snapshot values and
+            # store it in shadow state so next command sees this pending write
             values = self._latest_snapshot.get_module_values(module)
+            self._pending_writes[module] = values
 
-        # Update target output while preserving others
+        # Update target output while preserving others (shadow state owns this list,
+        # so it is updated in place instead of copied per command)
         values[output - 1] = value
 
-        # Store in shadow state so next command sees this pending write
-        self._pending_writes[module] = values
-
         # Use frame_builder to construct the proper command
-        from frame_builder import build_exo_set_values_frame, build_frame_request_command
-
         # Calculate module address: 60 + (module - 1)
         to_address = 60 + (module - 1)
 
@@ -1269,9 +1365,9 @@ class IPComClient:
         command = build_frame_request_command(frame)
 
         # Send command (will be encrypted by send_command)
-        self.logger.info(f"Setting module {module} output {output} to {value}")
+        self.logger.info("Setting module %s output %s to %s", module, output, value)
         if self.debug:
-            self.logger.debug(f"Sending values for module {module}: {values}")
+            self.logger.debug("Sending values for module %s: %s", module, values)
         self.send_command(command)
 
     def send_keepalive(self):
@@ -1306,13 +1402,11 @@ class IPComClient:
             raise RuntimeError("Not connected")
 
         # Send RAW keepalive (matches official app behavior from Wireshark)
-        KEEPALIVE_BYTES = b'\x79\xdb'
-
         if self.debug:
             self.logger.debug("Sending RAW keepalive (79 db)")
 
-        self._socket.sendall(KEEPALIVE_BYTES)
-        self._last_write_time = time.time()
+        self._socket.sendall(self.SNAPSHOT_REQUEST_BYTES)
+        self._write_deadline = time.monotonic() + self.WRITE_RATE_LIMIT
 
     def start_snapshot_polling(self, interval: float = 0.350):
         """
@@ -1328,33 +1422,36 @@ class IPComClient:
 
         This replicates the WidgetOutput behavior when Domotique panel opens.
         """
-        import threading
-
         if not self._connected:
             raise RuntimeError("Not connected")
 
-        # Set flag
-        self._polling_enabled = True
+        poll_stop = self._poll_stop
+        poll_stop.clear()
 
         def polling_loop():
             """Background polling thread."""
-            while self._connected and self._polling_enabled:
+            # Schedule against monotonic deadlines so the cadence doesn't drift
+            # by the time spent sending; the wait returns as soon as polling stops
+            next_deadline = time.monotonic()
+            while self._connected and not poll_stop.is_set():
                 try:
                     if not self._processing:  # Don't send if other command in progress
                         self.request_snapshot()
-                    time.sleep(interval)
                 except Exception as e:
-                    self.logger.error(f"Error in polling loop: {e}")
+                    self.logger.error("Error in polling loop: %s", e)
                     break
+                now = time.monotonic()
+                next_deadline = max(next_deadline + interval, now)
+                poll_stop.wait(next_deadline - now)
 
         # Start daemon thread
         polling_thread = threading.Thread(target=polling_loop, daemon=True)
         polling_thread.start()
-        self.logger.info(f"Started snapshot polling (interval={interval}s)")
+        self.logger.info("Started snapshot polling (interval=%ss)", interval)
 
     def stop_snapshot_polling(self):
         """Stop periodic snapshot polling."""
-        self._polling_enabled = False
+        self._poll_stop.set()
         self.logger.info("Stopped snapshot polling")
 
     # ==================================================================================
@@ -1366,10 +1463,9 @@ class IPComClient:
         Start persistent connection mode with background loops (matches official app).
 
         This replaces the inefficient connect-poll-disconnect pattern with:
-        1. Keep-Alive Loop (30s interval) - Prevents TCP timeout
-        2. Status Poll Loop (350ms interval) - Continuous state updates (~2.86/sec)
-        3. Command Queue Loop (250ms interval) - Processes queued commands
-        4. Receive Loop (continuous) - Handles incoming data
+        1. Scheduler Loop - Keep-alive (30s), status poll (350ms, ~2.86/sec)
+           and queued commands
+        2. Receive Loop (continuous) - Handles incoming data
 
         Based on reverse engineering findings from HomeAnywhere Blue app.
 
@@ -1400,31 +1496,15 @@ class IPComClient:
         # Start background loops
         self.logger.info("Starting persistent connection mode (official app behavior)")
 
-        # 1. Keep-Alive Loop (30s interval)
-        self._keepalive_thread = threading.Thread(
-            target=self._keepalive_loop,
-            name="IPCom-KeepAlive",
+        # 1. Scheduler Loop (keep-alive, status poll, command queue)
+        self._scheduler_thread = threading.Thread(
+            target=self._scheduler_loop,
+            name="IPCom-Scheduler",
             daemon=True
         )
-        self._keepalive_thread.start()
+        self._scheduler_thread.start()
 
-        # 2. Status Poll Loop (350ms interval)
-        self._status_poll_thread = threading.Thread(
-            target=self._status_poll_loop,
-            name="IPCom-StatusPoll",
-            daemon=True
-        )
-        self._status_poll_thread.start()
-
-        # 3. Command Queue Loop (250ms interval)
-        self._command_queue_thread = threading.Thread(
-            target=self._command_queue_loop,
-            name="IPCom-CommandQueue",
-            daemon=True
-        )
-        self._command_queue_thread.start()
-
-        # 4. Receive Loop (continuous)
+        # 2. Receive Loop (continuous)
         self._receive_thread = threading.Thread(
             target=self._persistent_receive_loop,
             args=(auto_reconnect,),
@@ -1434,10 +1514,8 @@ class IPComClient:
         self._receive_thread.start()
 
         self.logger.info(
-            "Persistent connection established: "
-            f"keep-alive={self.KEEPALIVE_INTERVAL}s, "
-            f"polling={self.STATUS_POLL_INTERVAL}s, "
-            f"cmd_queue={self.COMMAND_QUEUE_INTERVAL}s"
+            "Persistent connection established: keep-alive=%ss, polling=%ss",
+            self.KEEPALIVE_INTERVAL, self.STATUS_POLL_INTERVAL
         )
 
         return True
@@ -1458,9 +1536,7 @@ class IPComClient:
 
         # Wait for threads to finish (with timeout)
         for thread in [
-            self._keepalive_thread,
-            self._status_poll_thread,
-            self._command_queue_thread,
+            self._scheduler_thread,
             self._receive_thread
         ]:
             if thread and thread.is_alive():
@@ -1471,135 +1547,105 @@ class IPComClient:
 
         self.logger.info("Persistent connection stopped")
 
-    def _keepalive_loop(self):
+    def _scheduler_loop(self):
         """
-        Background loop: Send keep-alive every 30 seconds.
+        Background loop: keep-alive, status polling and queued commands on one thread.
 
-        Purpose:
-        - Prevents TCP connection timeout
-        - Detects disconnections early
-        - Matches official app behavior (KeepAliveRequestCommand every 30s)
+        Schedule:
+        - Keep-alive every 30s (official app: KeepAliveRequestCommand every 30s)
+        - Status poll every 350ms (IPCommunication.cs:554-599: GetExoOutputs() timer)
+        - Queued commands as soon as they arrive, each followed by a short wait
+          so the device can respond (official app: processing=true pauses polling)
 
-        From IPCommunication.cs: KeepAlive timer runs while connected.
+        Running these on one thread serializes all scheduled writes without a lock;
+        the thread sleeps on the command event until the next timer is due.
         """
-        self.logger.debug("Keep-Alive loop started (interval=30s)")
-
-        while self._persistent_mode and not self._shutdown_event.is_set():
-            try:
-                if self._connected and self._authenticated:
-                    # Don't send if command is processing
-                    if not self._processing:
-                        with self._lock:
-                            try:
-                                self.send_keepalive()
-                                self.logger.debug("Keep-alive sent")
-                            except Exception as e:
-                                self.logger.error(f"Keep-alive failed: {e}")
-                                # Connection might be dead, receive loop will handle reconnect
-
-                # Wait for next interval
-                self._shutdown_event.wait(timeout=self.KEEPALIVE_INTERVAL)
-
-            except Exception as e:
-                self.logger.error(f"Error in keep-alive loop: {e}")
-                if not self._persistent_mode:
-                    break
-                time.sleep(1.0)
-
-        self.logger.debug("Keep-Alive loop stopped")
-
-    def _status_poll_loop(self):
-        """
-        Background loop: Poll status every 350ms.
-
-        Purpose:
-        - Continuous state updates (~2.86 updates per second)
-        - Triggers on_state_snapshot callbacks for real-time UI updates
-        - Matches official app behavior (GetExoOutputs() every 350ms)
+        self.logger.debug(
+            "Scheduler loop started (keep-alive=%ss, polling=%ss)",
+            self.KEEPALIVE_INTERVAL, self.STATUS_POLL_INTERVAL
+        )
 
-        From IPCommunication.cs:554-599: GetExoOutputs() runs on timer with 350ms delay.
-        """
-        self.logger.debug("Status Poll loop started (interval=350ms)")
+        next_keepalive = next_poll = time.monotonic()
 
         while self._persistent_mode and not self._shutdown_event.is_set():
             try:
-                if self._connected and self._authenticated:
-                    # Don't send if command is processing
-                    if not self._processing:
-                        with self._lock:
-                            try:
-                                self.request_snapshot()
-                            except Exception as e:
-                                self.logger.error(f"Status poll failed: {e}")
-                                # Connection might be dead, receive loop will handle reconnect
-
-                # Wait for next interval
-                self._shutdown_event.wait(timeout=self.STATUS_POLL_INTERVAL)
+                now = time.monotonic()
+
+                # Keep-alive: prevents TCP timeout, detects disconnections early
+                if now >= next_keepalive:
+                    next_keepalive = now + self.KEEPALIVE_INTERVAL
+                    if self._connected and self._authenticated:
+                        try:
+                            self.send_keepalive()
+                            self.logger.debug("Keep-alive sent")
+                        except Exception as e:
+                            self.logger.error("Keep-alive failed: %s", e)
+                            # Connection might be dead, receive loop will handle reconnect
+
+                # Status poll: continuous state updates (~2.86 updates per second)
+                if now >= next_poll:
+                    next_poll = now + self.STATUS_POLL_INTERVAL
+                    if self._connected and self._authenticated:
+                        try:
+                            self.request_snapshot()
+                        except Exception as e:
+                            self.logger.error("Status poll failed: %s", e)
+                            # Connection might be dead, receive loop will handle reconnect
+
+                # Wait for a queued command until the next timer is due
+                if not self._command_deque:
+                    self._command_event.wait(
+                        max(0.0, min(next_keepalive, next_poll) - time.monotonic())
+                    )
+                    self._command_event.clear()
+                    continue
+
+                # Run the whole burst of queued commands before checking the timers again;
+                # each one is followed by COMMAND_RESPONSE_DELAY so the device gets time
+                # between writes (relay interlocks, timed shutter moves)
+                commands = self._command_deque
+                while commands and not self._shutdown_event.is_set():
+                    self._execute_queued_command(commands.popleft())
 
             except Exception as e:
-                self.logger.error(f"Error in status poll loop: {e}")
+                self.logger.error("Error in scheduler loop: %s", e)
                 if not self._persistent_mode:
                     break
                 time.sleep(0.5)
 
-        self.logger.debug("Status Poll loop stopped")
+        self.logger.debug("Scheduler loop stopped")
 
-    def _command_queue_loop(self):
+    def _execute_queued_command(self, command: tuple[Callable, tuple, dict]):
         """
-        Background loop: Process command queue every 250ms.
+        Execute one command taken from the command queue.
 
-        Purpose:
-        - Handles user commands without blocking status polling
-        - Sets _processing flag to pause polling during command execution
-        - Waits for command response before resuming polling
-        - Matches official app behavior (command processing with polling pause)
+        Sets the _processing flag while the command runs so snapshot polling
+        (start_snapshot_polling) pauses, matching the official app, then waits
+        COMMAND_RESPONSE_DELAY so consecutive commands reach the device spaced out.
 
-        From official app: Commands set processing=true, pause polling, execute, resume.
+        Args:
+            command: Queued (func, args, kwargs) tuple
         """
-        self.logger.debug("Command Queue loop started (interval=250ms)")
+        if self._connected and self._authenticated:
+            self._processing = True
 
-        while self._persistent_mode and not self._shutdown_event.is_set():
             try:
-                # Check for queued commands (non-blocking with timeout)
-                try:
-                    command = self._command_queue.get(timeout=self.COMMAND_QUEUE_INTERVAL)
-                except queue.Empty:
-                    continue
-
-                # Process command
-                if self._connected and self._authenticated:
-                    # Set processing flag to pause polling
-                    self._processing = True
-
-                    try:
-                        # Execute command
-                        command_func = command["func"]
-                        command_args = command.get("args", ())
-                        command_kwargs = command.get("kwargs", {})
-
-                        self.logger.debug(f"Executing queued command: {command_func.__name__}")
-                        command_func(*command_args, **command_kwargs)
-
-                        # Wait briefly for response
-                        time.sleep(0.1)
-
-                    except Exception as e:
-                        self.logger.error(f"Error executing command: {e}")
+                command_func, command_args, command_kwargs = command
 
-                    finally:
-                        # Resume polling
-                        self._processing = False
+                self.logger.debug("Executing queued command: %s", command_func.__name__)
+                if command_kwargs:
+                    command_func(*command_args, **command_kwargs)
+                else:
+                    command_func(*command_args)
 
-                # Mark task as done
-                self._command_queue.task_done()
+                # Wait briefly for the response before the next write or poll
+                self._shutdown_event.wait(self.COMMAND_RESPONSE_DELAY)
 
             except Exception as e:
-                self.logger.error(f"Error in command queue loop: {e}")
-                if not self._persistent_mode:
-                    break
-                time.sleep(0.5)
+                self.logger.error("Error executing command: %s", e)
 
-        self.logger.debug("Command Queue loop stopped")
+            finally:
+                self._processing = False
 
     def _persistent_receive_loop(self, auto_reconnect: bool):
         """
@@ -1616,15 +1662,23 @@ class IPComClient:
         self.logger.debug("Receive loop started (persistent mode)")
         reconnect_delay = self.RECONNECT_BASE_DELAY
 
-        while self._persistent_mode and not self._shutdown_event.is_set():
+        # Bound once; the state flags are still read from self since other threads change them
+        receive = self._receive_loop
+        cleanup = self._cleanup_socket
+        shutting_down = self._shutdown_event.is_set
+        # Full traceback only for the first unexpected error per connection
+        traceback_logged = False
+
+        while self._persistent_mode and not shutting_down():
             # Reconnect if disconnected
             if not self._connected:
                 if auto_reconnect:
-                    self.logger.info(f"Reconnecting in {reconnect_delay:.1f}s...")
+                    self.logger.info("Reconnecting in %.1fs...", reconnect_delay)
                     time.sleep(reconnect_delay)
 
                     if self.connect() and self.authenticate():
                         reconnect_delay = self.RECONNECT_BASE_DELAY
+                        traceback_logged = False
                         self.logger.info("Reconnected successfully")
                     else:
                         reconnect_delay = min(
@@ -1637,21 +1691,24 @@ class IPComClient:
 
             # Receive and process data
             try:
-                self._receive_loop()
+                receive()
             except socket.timeout:
                 # Timeout is normal, just continue
                 continue
             except socket.error as e:
                 # Ignore errors if we're shutting down
                 if self._persistent_mode and self._connected:
-                    self.logger.error(f"Socket error in receive loop: {e}")
-                self._cleanup_socket()
+                    self.logger.error("Socket error in receive loop: %s", e)
+                cleanup()
                 if not auto_reconnect or not self._persistent_mode:
                     break
             except Exception as e:
                 if self._persistent_mode:  # Only log if not shutting down
-                    self.logger.error(f"Unexpected error in receive loop: {e}", exc_info=True)
-                self._cleanup_socket()
+                    self.logger.error(
+                        "Unexpected error in receive loop: %s", e, exc_info=not traceback_logged
+                    )
+                    traceback_logged = True
+                cleanup()
                 if not auto_reconnect or not self._persistent_mode:
                     break
 
@@ -1659,7 +1716,7 @@ class IPComClient:
 
     def queue_command(self, func: Callable, *args, **kwargs):
         """
-        Queue a command for execution in the command queue loop.
+        Queue a command for execution in the scheduler loop.
 
         This allows commands to be executed without blocking the caller,
         and ensures proper synchronization with status polling.
@@ -1669,14 +1726,11 @@ class IPComClient:
             *args: Positional arguments for the command
             **kwargs: Keyword arguments for the command
         """
-        self._command_queue.put({
-            "func": func,
-            "args": args,
-            "kwargs": kwargs
-        })
+        self._command_deque.append((func, args, kwargs))
+        self._command_event.set()
 
         if self.debug:
-            self.logger.debug(f"Queued command: {func.__name__}")
+            self.logger.debug("Queued command: %s", func.__name__)
 
     # ==================================================================================
     # Callback registration
@@ -1687,7 +1741,7 @@ class IPComClient:
         Args:
             callback: Function(StateSnapshot) -> None
         """
-        self._on_state_snapshot = callback
+        self._on_state_snapshot = callback or _noop
 
     def on_frame(self, callback: Callable[[Frame], None]):
         """
@@ -1696,7 +1750,7 @@ class IPComClient:
         Args:
             callback: Function(Frame) -> None
         """
-        self._on_frame = callback
+        self._on_frame = callback or _noop
 
     def on_connect(self, callback: Callable[[], None]):
         """
@@ -1705,7 +1759,7 @@ class IPComClient:
         Args:
             callback: Function() -> None
         """
-        self._on_connect = callback
+        self._on_connect = callback or _noop
 
     def on_disconnect(self, callback: Callable[[], None]):
         """
@@ -1714,4 +1768,4 @@ class IPComClient:
         Args:
             callback: Function() -> None
         """
-        self._on_disconnect = callback
+        self._on_disconnect = callback or _noop
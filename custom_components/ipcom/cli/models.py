@@ -5,10 +5,23 @@ Based on protocol specification extracted from Home_Anywhere_D.dll decompilation
 """
 
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Optional, Union
 
 
-@dataclass
+# Command type (first data byte) -> name, used for frame representations
+COMMAND_NAMES = {
+    1: "Connect",
+    2: "Disconnect",
+    3: "KeepAlive",
+    4: "Frame",
+    5: "ExoOutputs",
+    6: "KeyboardStatus",
+    14: "NonSecureConnect",
+    35: "TriCom",
+}
+
+
+@dataclass(slots=True)
 class Frame:
     """
     Represents a complete IPCom protocol frame.
@@ -25,7 +38,8 @@ class Frame:
         to: Destination address
         from_: Source address
         length: Length of Data field + 1
-        data: Command data (includes command type as first byte)
+        data: Command data (includes command type as first byte); received frames
+            carry the bytearray produced by decryption
         checksum: XOR of all bytes in Data field
     """
 
@@ -33,7 +47,7 @@ class Frame:
     to: int
     from_: int  # 'from' is a keyword, use 'from_'
     length: int
-    data: bytes
+    data: Union[bytes, bytearray]
     checksum: int
 
     def __post_init__(self):
@@ -63,16 +77,7 @@ class Frame:
     def __repr__(self) -> str:
         """Human-readable representation."""
         cmd_type = self.command_type
-        cmd_name = {
-            1: "Connect",
-            2: "Disconnect",
-            3: "KeepAlive",
-            4: "Frame",
-            5: "ExoOutputs",
-            6: "KeyboardStatus",
-            14: "NonSecureConnect",
-            35: "TriCom",
-        }.get(cmd_type, f"Unknown({cmd_type})")
+        cmd_name = COMMAND_NAMES.get(cmd_type) or f"Unknown({cmd_type})"
 
         return (
             f"Frame(type={cmd_name}, to={self.to}, from={self.from_}, "
@@ -80,7 +85,7 @@ class Frame:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class StateSnapshot:
     """
     Represents a decoded ExoOutputs state snapshot (Command Type 5).
@@ -248,7 +253,7 @@ class StateSnapshot:
         return f"StateSnapshot(modules=16, outputs=128, non_zero={non_zero})"
 
 
-@dataclass
+@dataclass(slots=True)
 class ElementConfig:
     """
     Represents an element configuration from SOAP discovery.
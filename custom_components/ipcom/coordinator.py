@@ -350,6 +350,10 @@ class IPComCoordinator(DataUpdateCoordinator[dict[str, Any]]):
             # Update device state
             if entity_key in self._device_state:
                 device = self._device_state[entity_key]
+                if device.get("value") == new_value:
+                    # Already up to date (e.g. covered by the initial status fetch)
+                    continue
+
                 device["value"] = new_value
                 device["state"] = "on" if new_value > 0 else "off"
 
@@ -360,8 +364,8 @@ class IPComCoordinator(DataUpdateCoordinator[dict[str, Any]]):
                         # EXO DIM: Value is 0-100 directly
                         device["brightness"] = new_value
                     else:
-                        # Regular dimmer: Convert 0-255 to 0-100
-                        device["brightness"] = int((new_value / 255) * 100) if new_value > 0 else 0
+                        # Regular dimmer: Convert 0-255 to 0-100 (rounded like light.py)
+                        device["brightness"] = round(new_value * 100 / 255)
 
                 updated = True
             else:
@@ -11,6 +11,7 @@ from homeassistant.components.cover import (
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
@@ -28,21 +29,16 @@ async def async_setup_entry(
     """Set up IPCom covers from config entry."""
     coordinator: IPComCoordinator = hass.data[DOMAIN][entry.entry_id]
 
-    entities = []
-    covers_added = set()
-
-    for entity_key, device_data in coordinator.data["devices"].items():
-        category = device_data.get("category")
-        if category == "shutters":
-            relay_role = device_data.get("relay_role")
-            device_key = device_data.get("device_key")
-
-            # Only create cover for "up" relay (to avoid duplicates)
-            if relay_role == "up" and device_key not in covers_added:
-                entities.append(IPComCover(coordinator, entity_key, device_data))
-                covers_added.add(device_key)
-
-    async_add_entities(entities)
+    # Only create a cover for the "up" relay (to avoid duplicates); device
+    # entries are keyed by device_key, so each shutter appears once
+    async_add_entities(
+        [
+            IPComCover(coordinator, entity_key, device_data)
+            for entity_key, device_data in coordinator.data["devices"].items()
+            if device_data.get("category") == "shutters"
+            and device_data.get("relay_role") == "up"
+        ]
+    )
 
 
 class IPComCover(CoordinatorEntity[IPComCoordinator], CoverEntity):
@@ -63,20 +59,17 @@ class IPComCover(CoordinatorEntity[IPComCoordinator], CoverEntity):
         self._attr_unique_id = f"ipcom_{self._device_key}"
         self._attr_name = device_data.get("display_name", self._device_key.upper())
 
-        # Store device metadata for device_info
         self._module = device_data.get("module")
         self._output = device_data.get("output")
 
-    @property
-    def device_info(self) -> dict[str, Any]:
-        """Return device information for grouping in HA UI."""
-        return {
-            "identifiers": {(DOMAIN, self._attr_unique_id)},
-            "name": self._attr_name,
-            "manufacturer": "Home Anywhere Blue",
-            "model": "IPCom Shutter",
-            "sw_version": f"Module {self._module}",
-        }
+        # Device info is static per entity, build it once for grouping in HA UI
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, self._attr_unique_id)},
+            name=self._attr_name,
+            manufacturer="Home Anywhere Blue",
+            model="IPCom Shutter",
+            sw_version=f"Module {self._module}",
+        )
 
     @property
     def is_closed(self) -> bool | None:
@@ -10,7 +10,8 @@ from homeassistant.components.light import (
     LightEntity,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
@@ -19,6 +20,13 @@ from .coordinator import IPComCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
+# Brightness conversion tables: CLI percentage (0-100) <-> HA brightness (0-255)
+_CLI_TO_HA = tuple(round(i * 255 / 100) for i in range(101))
+_HA_TO_CLI = tuple(round(i * 100 / 255) for i in range(256))
+
+# Shared stand-in for missing coordinator data (never mutated)
+_EMPTY: dict[str, Any] = {}
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -28,17 +36,17 @@ async def async_setup_entry(
     """Set up IPCom lights from config entry."""
     coordinator: IPComCoordinator = hass.data[DOMAIN][entry.entry_id]
 
-    entities = []
-    for entity_key, device_data in coordinator.data["devices"].items():
-        category = device_data.get("category")
-        if category == "lights":
-            device_type = device_data.get("type", "switch")
-            if device_type == "dimmer":
-                entities.append(IPComDimmerLight(coordinator, entity_key, device_data))
-            else:
-                entities.append(IPComLight(coordinator, entity_key, device_data))
-
-    async_add_entities(entities)
+    async_add_entities(
+        [
+            (
+                IPComDimmerLight
+                if device_data.get("type", "switch") == "dimmer"
+                else IPComLight
+            )(coordinator, entity_key, device_data)
+            for entity_key, device_data in coordinator.data["devices"].items()
+            if device_data.get("category") == "lights"
+        ]
+    )
 
 
 class IPComLight(CoordinatorEntity[IPComCoordinator], LightEntity):
@@ -59,36 +67,71 @@ class IPComLight(CoordinatorEntity[IPComCoordinator], LightEntity):
         self._attr_color_mode = ColorMode.ONOFF
         self._attr_supported_color_modes = {ColorMode.ONOFF}
 
-        # Store device metadata for device_info
         self._module = device_data.get("module")
         self._output = device_data.get("output")
 
-    @property
-    def device_info(self) -> dict[str, Any]:
-        """Return device information for grouping in HA UI."""
-        return {
-            "identifiers": {(DOMAIN, self._attr_unique_id)},
-            "name": self._attr_name,
-            "manufacturer": "Home Anywhere Blue",
-            "model": "IPCom Light",
-            "sw_version": f"Module {self._module}",
-        }
-
-    @property
-    def is_on(self) -> bool:
-        """Return True if light is on."""
-        device_data = self.coordinator.data["devices"].get(self._entity_key)
-        if not device_data:
-            return False
-        return device_data.get("state") == "on"
+        # Device info is static per entity, build it once for grouping in HA UI
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, self._attr_unique_id)},
+            name=self._attr_name,
+            manufacturer="Home Anywhere Blue",
+            model="IPCom Light",
+            sw_version=f"Module {self._module}",
+        )
+
+        # Current device state, refreshed once per coordinator update
+        self._device_data: dict[str, Any] | None = None
+        self._update_from_device_data()
+
+    def _lookup_device_data(self) -> dict[str, Any] | None:
+        """Return this light's entry from the latest coordinator data."""
+        devices = (self.coordinator.data or _EMPTY).get("devices") or _EMPTY
+        return devices.get(self._entity_key)
+
+    def _update_from_device_data(self) -> None:
+        """Refresh the cached state attributes from the coordinator data."""
+        device_data = self._device_data = self._lookup_device_data()
+        self._attr_is_on = bool(device_data) and device_data.get("state") == "on"
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Update cached state before writing it to HA."""
+        self._update_from_device_data()
+        super()._handle_coordinator_update()
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the light on."""
-        await self.coordinator.async_execute_command(self._device_key, "on")
+        await self._async_send_command("on", "on")
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the light off."""
-        await self.coordinator.async_execute_command(self._device_key, "off")
+        await self._async_send_command("off", "off")
+
+    def _set_optimistic_state(self, is_on: bool, value: int | None) -> None:
+        """Show the expected state until the coordinator reports the real one."""
+        self._attr_is_on = is_on
+
+    async def _async_send_command(
+        self, command: str, state: str, value: int | None = None
+    ) -> None:
+        """Execute a command, showing the expected state immediately.
+
+        The expected state is kept on the entity only; the next coordinator update
+        replaces it with the reported state. If the command fails or is cancelled,
+        the last reported state is shown again.
+        """
+        self._set_optimistic_state(state == "on", value)
+        self.async_write_ha_state()
+
+        succeeded = False
+        try:
+            succeeded = await self.coordinator.async_execute_command(
+                self._device_key, command, value
+            )
+        finally:
+            if not succeeded:
+                self._update_from_device_data()
+                self.async_write_ha_state()
 
 
 class IPComDimmerLight(IPComLight):
@@ -105,30 +148,30 @@ class IPComDimmerLight(IPComLight):
         self._attr_color_mode = ColorMode.BRIGHTNESS
         self._attr_supported_color_modes = {ColorMode.BRIGHTNESS}
 
-    @property
-    def brightness(self) -> int | None:
-        """Return the brightness of the light (0-255)."""
-        device_data = self.coordinator.data["devices"].get(self._entity_key)
-        if not device_data:
-            return None
+    def _update_from_device_data(self) -> None:
+        """Refresh the cached state and brightness (0-255)."""
+        super()._update_from_device_data()
+        if not (device_data := self._device_data):
+            self._attr_brightness = None
+            return
 
-        # CLI returns brightness 0-100
+        # CLI returns brightness 0-100, convert to HA's 0-255 range
         cli_brightness = device_data.get("brightness", 0)
-        # Convert to HA's 0-255 range
-        return int((cli_brightness / 100) * 255)
+        self._attr_brightness = _CLI_TO_HA[min(100, max(0, cli_brightness))]
+
+    def _set_optimistic_state(self, is_on: bool, value: int | None) -> None:
+        """Show the expected state and brightness (CLI 0-100) until confirmed."""
+        super()._set_optimistic_state(is_on, value)
+        if value is not None:
+            self._attr_brightness = _CLI_TO_HA[min(100, max(0, value))]
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the light on, optionally setting brightness."""
         if ATTR_BRIGHTNESS in kwargs:
-            # Convert HA brightness (0-255) to CLI (0-100)
-            ha_brightness = kwargs[ATTR_BRIGHTNESS]
-            cli_brightness = int((ha_brightness / 255) * 100)
-            # Ensure minimum brightness of 1% when turning on
-            if cli_brightness == 0:
-                cli_brightness = 1
-            await self.coordinator.async_execute_command(
-                self._device_key, "dim", cli_brightness
-            )
+            # Convert HA brightness (0-255) to CLI (0-100),
+            # ensuring a minimum brightness of 1% when turning on
+            cli_brightness = _HA_TO_CLI[kwargs[ATTR_BRIGHTNESS]] or 1
+            await self._async_send_command("dim", "on", cli_brightness)
         else:
             # No brightness specified, just turn on
-            await self.coordinator.async_execute_command(self._device_key, "on")
+            await self._async_send_command("on", "on")